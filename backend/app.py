@@ -3,8 +3,17 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from config import Config
 from chatbot import chatbot
+from jobs import job_runner
+from complaint_clustering import (
+    complaint_index, signature, similarity, encode_signature, decode_signature, room_area, recluster
+)
 from datetime import datetime
 from werkzeug.exceptions import HTTPException
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+import click
+from contextlib import nullcontext
+import json
+import os
 
 # ----------------- Flask App Setup -----------------
 app = Flask(__name__)
@@ -66,6 +75,35 @@ class Complaint(db.Model):
     description = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(20), default='Pending')
     complaint_date = db.Column(db.DateTime, default=datetime.utcnow)
+    cluster_id = db.Column(db.Integer, nullable=True, index=True)
+
+
+class ComplaintCluster(db.Model):
+    __tablename__ = 'complaint_clusters'
+    cluster_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    issue_type = db.Column(db.String(30), nullable=False)
+    area = db.Column(db.String(10), nullable=False)
+    signature = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='Open')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    job_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    name = db.Column(db.String(50), nullable=False, index=True)
+    params = db.Column(db.Text, nullable=True)
+    state = db.Column(db.Text().with_variant(MEDIUMTEXT(), 'mysql'), nullable=True)
+    status = db.Column(db.String(20), default='Queued', index=True)
+    progress = db.Column(db.Float, default=0)
+    result = db.Column(db.Text().with_variant(MEDIUMTEXT(), 'mysql'), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+
+job_runner.init_app(app, db, Job, workers=Config.JOB_WORKERS, retention_days=Config.JOB_RETENTION_DAYS)
 
 
 # ----------------- Helper -----------------
@@ -86,6 +124,123 @@ def get_room_availability():
     return result
 
 
+def get_complaint_index():
+    if not complaint_index.loaded:
+        for cluster in ComplaintCluster.query.filter_by(status='Open').all():
+            complaint_index.add(
+                cluster.cluster_id, (cluster.issue_type, cluster.area), decode_signature(cluster.signature)
+            )
+        complaint_index.loaded = True
+    return complaint_index
+
+
+def find_open_cluster(index, group, sig):
+    # The index can be stale: another process may have resolved a cluster,
+    # or recluster-complaints may have replaced them all. Confirm each match
+    # against the database and drop entries that no longer hold.
+    cluster_id = index.find(group, sig)
+    while cluster_id is not None:
+        cluster = ComplaintCluster.query.get(cluster_id)
+        if cluster and cluster.status == 'Open' and (cluster.issue_type, cluster.area) == group \
+                and similarity(sig, decode_signature(cluster.signature)) >= index.threshold:
+            return cluster_id
+        index.remove(cluster_id)
+        cluster_id = index.find(group, sig)
+    return None
+
+
+def complaint_area(student_id):
+    student = Student.query.filter_by(student_id=student_id).first()
+    return room_area(student.room_no if student else None)
+
+
+# ----------------- Background Jobs -----------------
+@job_runner.job('room_availability')
+def reconcile_room_availability(ctx):
+    """Recompute rooms.availability from current allocations, chunk by chunk."""
+    state = ctx.state or {'last_room_no': '', 'processed': 0, 'updated': 0}
+    total = Room.query.count()
+    while True:
+        rooms = Room.query.filter(Room.room_no > state['last_room_no']) \
+            .order_by(Room.room_no).limit(Config.JOB_CHUNK_SIZE).all()
+        if not rooms:
+            break
+        occupied = {room_no for (room_no,) in db.session.query(Student.room_no)
+                    .filter(Student.room_no.in_([r.room_no for r in rooms])).distinct()}
+        for room in rooms:
+            availability = 'Occupied' if room.room_no in occupied else 'Available'
+            if room.availability != availability:
+                room.availability = availability
+                state['updated'] += 1
+        state['last_room_no'] = rooms[-1].room_no
+        state['processed'] += len(rooms)
+        ctx.checkpoint(state, state['processed'] * 100 / max(total, 1))
+    return {'rooms_checked': state['processed'], 'rooms_updated': state['updated']}
+
+
+def current_month():
+    return datetime.utcnow().strftime('%Y-%m')
+
+
+@job_runner.job('payment_summary')
+def summarize_payments(ctx):
+    """Total one month's payments and reconcile them against registered students."""
+    month = ctx.params.get('month') or current_month()
+    start = datetime.strptime(month, '%Y-%m').date()
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    in_month = Payment.query.filter(Payment.payment_date >= start, Payment.payment_date < end)
+    # Checkpointed state stays small: per-student data is queried at the end.
+    state = ctx.state or {
+        'last_payment_id': 0, 'processed': 0, 'total_amount': 0.0,
+        'by_type': {}, 'by_status': {}
+    }
+    total = in_month.count()
+    while True:
+        payments = in_month.filter(Payment.payment_id > state['last_payment_id']) \
+            .order_by(Payment.payment_id).limit(Config.JOB_CHUNK_SIZE).all()
+        if not payments:
+            break
+        for p in payments:
+            amount = float(p.amount)
+            state['total_amount'] += amount
+            state['by_type'][p.payment_type] = state['by_type'].get(p.payment_type, 0) + amount
+            state['by_status'][p.status] = state['by_status'].get(p.status, 0) + 1
+        state['last_payment_id'] = payments[-1].payment_id
+        state['processed'] += len(payments)
+        ctx.checkpoint(state, state['processed'] * 100 / max(total, 1))
+
+    student_ids = {student_id for (student_id,) in db.session.query(Student.student_id)}
+    paid = {student_id for (student_id,) in in_month.with_entities(Payment.student_id).distinct()}
+    return {
+        'month': month,
+        'payment_count': state['processed'],
+        'total_amount': round(state['total_amount'], 2),
+        'by_type': {k: round(v, 2) for k, v in state['by_type'].items()},
+        'by_status': state['by_status'],
+        'students_paid': len(paid & student_ids),
+        'students_unpaid': sorted(student_ids - paid),
+        'unknown_students': sorted(paid - student_ids)
+    }
+
+
+job_runner.every('room_availability', Config.ROOM_RECONCILE_INTERVAL)
+job_runner.every('payment_summary', Config.PAYMENT_SUMMARY_INTERVAL, params=lambda: {'month': current_month()})
+
+
+def serialize_job(job):
+    return {
+        'job_id': job.job_id,
+        'name': job.name,
+        'params': json.loads(job.params or '{}'),
+        'status': job.status,
+        'progress': job.progress,
+        'error': job.error,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
 # ----------------- Routes -----------------
 @app.route('/')
 def home():
@@ -93,7 +248,7 @@ def home():
         "message": "Hostel Management API is running ✅",
         "endpoints": [
             "/api/dashboard", "/api/students", "/api/rooms",
-            "/api/payments", "/api/complaints", "/api/chatbot"
+            "/api/payments", "/api/complaints", "/api/jobs", "/api/chatbot"
         ]
     })
 
@@ -263,20 +418,61 @@ def handle_complaints():
             'issue_type': c.issue_type,
             'description': c.description,
             'status': c.status,
-            'complaint_date': c.complaint_date.isoformat()
+            'complaint_date': c.complaint_date.isoformat(),
+            'cluster_id': c.cluster_id
         } for c in complaints])
     else:
         data = request.get_json()
         if not data or not all(k in data for k in ['student_id', 'issue_type', 'description']):
             return jsonify({'error': 'Missing required fields'}), 400
-        complaint = Complaint(
-            student_id=data['student_id'],
-            issue_type=data['issue_type'],
-            description=data['description']
-        )
-        db.session.add(complaint)
-        db.session.commit()
-        return jsonify({'message': 'Complaint submitted successfully'})
+        index = get_complaint_index()
+        group = (data['issue_type'], complaint_area(data['student_id']))
+        sig = signature(data['description'])
+        with index.group_lock(group):
+            cluster_id = find_open_cluster(index, group, sig)
+            new_cluster = cluster_id is None
+            if new_cluster:
+                cluster = ComplaintCluster(issue_type=group[0], area=group[1], signature=encode_signature(sig))
+                db.session.add(cluster)
+                db.session.flush()
+                cluster_id = cluster.cluster_id
+            complaint = Complaint(
+                student_id=data['student_id'],
+                issue_type=data['issue_type'],
+                description=data['description'],
+                cluster_id=cluster_id
+            )
+            db.session.add(complaint)
+            db.session.commit()
+            if new_cluster:
+                index.add(cluster_id, group, sig)
+        return jsonify({
+            'message': 'Complaint submitted successfully',
+            'cluster_id': cluster_id,
+            'duplicate': not new_cluster
+        })
+
+
+@app.route('/api/complaints/clusters', methods=['GET'])
+def get_complaint_clusters():
+    counts = db.session.query(Complaint.cluster_id, db.func.count(Complaint.complaint_id)) \
+        .filter(Complaint.status == 'Pending', Complaint.cluster_id.isnot(None)) \
+        .group_by(Complaint.cluster_id).all()
+    pending = dict(counts)
+    clusters = ComplaintCluster.query.filter_by(status='Open').all()
+    return jsonify([{
+        'cluster_id': c.cluster_id,
+        'issue_type': c.issue_type,
+        'area': c.area,
+        'pending_complaints': pending.get(c.cluster_id, 0),
+        'created_at': c.created_at.isoformat()
+    } for c in clusters])
+
+
+def cluster_lock(cluster):
+    if not cluster:
+        return nullcontext()
+    return get_complaint_index().group_lock((cluster.issue_type, cluster.area))
 
 
 @app.route('/api/complaints/<int:complaint_id>/resolve', methods=['POST'])
@@ -284,11 +480,120 @@ def resolve_complaint(complaint_id):
     complaint = Complaint.query.get(complaint_id)
     if not complaint:
         return jsonify({'error': 'Complaint not found'}), 404
-    complaint.status = 'Resolved'
-    db.session.commit()
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    cluster_id = complaint.cluster_id
+    cluster = ComplaintCluster.query.get(cluster_id) if cluster_id is not None else None
+    # Same lock as inserts, so no complaint joins a cluster while it closes.
+    with cluster_lock(cluster):
+        if data.get('cluster') and cluster:
+            resolved = Complaint.query.filter_by(cluster_id=cluster_id, status='Pending') \
+                .update({'status': 'Resolved'}, synchronize_session=False)
+            cluster.status = 'Resolved'
+            db.session.commit()
+            get_complaint_index().remove(cluster_id)
+            return jsonify({'message': f'{resolved} complaints in cluster {cluster_id} marked as resolved'})
+        complaint.status = 'Resolved'
+        cluster_done = cluster is not None and not Complaint.query.filter(
+            Complaint.cluster_id == cluster_id,
+            Complaint.status == 'Pending',
+            Complaint.complaint_id != complaint_id
+        ).first()
+        if cluster_done:
+            cluster.status = 'Resolved'
+        db.session.commit()
+        if cluster_done:
+            get_complaint_index().remove(cluster_id)
     return jsonify({'message': 'Complaint marked as resolved'})
 
 
+@app.cli.command('recluster-complaints')
+@click.option('--processes', type=int, default=None, help='Worker processes (defaults to CPU count).')
+def recluster_complaints(processes):
+    """Rebuild complaint clusters for the whole complaints table."""
+    rooms = dict(db.session.query(Student.student_id, Student.room_no).all())
+    complaints = db.session.query(
+        Complaint.complaint_id, Complaint.student_id, Complaint.issue_type, Complaint.description, Complaint.status
+    ).order_by(Complaint.complaint_id).all()
+
+    ComplaintCluster.query.delete()
+    for status, cluster_status in (('Pending', 'Open'), ('Resolved', 'Resolved')):
+        records = [
+            (c.complaint_id, (c.issue_type, room_area(rooms.get(c.student_id))), c.description)
+            for c in complaints if c.status == status
+        ]
+        if not records:
+            continue
+        assignments, clusters = recluster(records, processes=processes)
+        rows = {
+            cluster_no: ComplaintCluster(
+                issue_type=group[0], area=group[1], signature=encode_signature(sig), status=cluster_status
+            )
+            for cluster_no, (group, sig) in clusters.items()
+        }
+        db.session.add_all(rows.values())
+        db.session.flush()
+        db.session.bulk_update_mappings(Complaint, [
+            {'complaint_id': complaint_id, 'cluster_id': rows[cluster_no].cluster_id}
+            for complaint_id, cluster_no in assignments.items()
+        ])
+        print(f"{len(records)} {status.lower()} complaints grouped into {len(clusters)} clusters")
+    db.session.commit()
+    complaint_index.clear()
+
+
+# ----------------- Jobs -----------------
+@app.route('/api/jobs', methods=['GET', 'POST'])
+def handle_jobs():
+    if request.method == 'GET':
+        query = Job.query
+        if request.args.get('name'):
+            query = query.filter_by(name=request.args['name'])
+        if request.args.get('status'):
+            query = query.filter_by(status=request.args['status'])
+        limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+        jobs = query.order_by(Job.job_id.desc()).limit(limit).all()
+        return jsonify([serialize_job(j) for j in jobs])
+    else:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        name = data.get('name')
+        if name not in job_runner.handlers:
+            return jsonify({'error': f'Unknown job, expected one of: {", ".join(sorted(job_runner.handlers))}'}), 400
+        if not job_runner.running:
+            return jsonify({'error': 'Job runner is not available, try again later'}), 503
+        params = data.get('params', {})
+        if not isinstance(params, dict):
+            return jsonify({'error': 'params must be an object'}), 400
+        if name == 'payment_summary' and params.get('month'):
+            try:
+                datetime.strptime(params['month'], '%Y-%m')
+            except (TypeError, ValueError):
+                return jsonify({'error': 'Invalid month format, expected YYYY-MM'}), 400
+        job = job_runner.enqueue(name, params)
+        return jsonify({'message': 'Job queued', 'job': serialize_job(job)}), 202
+
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    job = Job.query.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(serialize_job(job))
+
+
+@app.route('/api/jobs/<int:job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    job = Job.query.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status != 'Completed':
+        return jsonify({'error': f'Job is {job.status.lower()}', 'job': serialize_job(job)}), 409
+    return jsonify({'job_id': job.job_id, 'name': job.name, 'result': json.loads(job.result)})
+
+
 # ----------------- Auth -----------------
 @app.route('/api/register', methods=['POST'])
 def register():
@@ -355,9 +660,24 @@ def handle_exception(e: Exception):
 
 
 # ----------------- Main -----------------
+def upgrade_schema():
+    # create_all() only creates missing tables; add columns introduced later.
+    columns = {c['name'] for c in db.inspect(db.engine).get_columns('complaints')}
+    if 'cluster_id' not in columns:
+        db.session.execute(db.text('ALTER TABLE complaints ADD COLUMN cluster_id INT NULL'))
+        db.session.execute(db.text('CREATE INDEX idx_complaints_cluster ON complaints (cluster_id)'))
+        db.session.commit()
+    if db.engine.dialect.name == 'mysql':
+        job_columns = {c['name']: c['type'] for c in db.inspect(db.engine).get_columns('jobs')}
+        if not isinstance(job_columns['state'], MEDIUMTEXT):
+            db.session.execute(db.text('ALTER TABLE jobs MODIFY state MEDIUMTEXT, MODIFY result MEDIUMTEXT'))
+            db.session.commit()
+
+
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        upgrade_schema()
 
         if Room.query.count() == 0:
             rooms = [
@@ -381,5 +701,12 @@ if __name__ == '__main__':
             db.session.add(Complaint(student_id='S1002', issue_type='Plumbing', description='Leak in bathroom', status='Pending'))
             db.session.commit()
 
+    # The runner also starts on the first request (see JobRunner.init_app);
+    # starting here lets scheduled jobs run before anyone calls the API.
+    # debug=True turns on the reloader, whose parent process only watches
+    # files, so start in the serving child only.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        job_runner.try_start()
+
     print("✅ Server running at http://localhost:5000")
     app.run(debug=True, host='0.0.0.0', port=5000)
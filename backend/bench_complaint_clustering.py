@@ -0,0 +1,79 @@
+"""Insert-time cost of complaint clustering as the number of open clusters grows.
+
+Usage: python bench_complaint_clustering.py [--count 1000000] [--report-every 100000]
+                                            [--new-rate 0.1] [--floors 4]
+
+Feeds synthetic complaints through the same signature + index lookup path
+used by POST /api/complaints. A --new-rate share of complaints describe a
+new fault (random words from a large vocabulary); the rest repeat an
+earlier fault with filler noise. No cluster is ever resolved, so the
+index keeps growing. Each window reports the open cluster count, the
+average insert cost and the average number of candidates scored per lookup.
+"""
+import argparse
+import random
+import time
+
+from complaint_clustering import ComplaintClusterIndex, signature
+
+ISSUE_TYPES = ['WiFi', 'Electrical', 'Plumbing', 'Cleaning', 'Furniture']
+FAULTS = ['not working', 'broken', 'leaking', 'making noise', 'dirty', 'missing', 'loose', 'sparking']
+NOISE = ['', ' please fix', ' since morning', '!!', ' again', ' urgent', ' in room {room}']
+SYLLABLES = ['ba', 'ke', 'lo', 'mi', 'nu', 'ra', 'si', 'to', 'ven', 'dor', 'pal', 'gri', 'sho', 'tum', 'zel']
+
+
+def vocabulary(rng, size=5000):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def synthetic_complaints(count, new_rate=0.1, floors=4, seed=7):
+    rng = random.Random(seed)
+    vocab = vocabulary(rng)
+    incidents = []
+    for _ in range(count):
+        if not incidents or rng.random() < new_rate:
+            issue_type = rng.choice(ISSUE_TYPES)
+            floor = str(rng.randint(1, floors))
+            text = f"{' '.join(rng.sample(vocab, 3))} {rng.choice(FAULTS)}"
+            incidents.append((issue_type, floor, text))
+        else:
+            issue_type, floor, text = rng.choice(incidents)
+        room = f'{floor}{rng.randint(1, 40):02d}'
+        yield issue_type, floor, text + rng.choice(NOISE).format(room=room)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=1_000_000)
+    parser.add_argument('--report-every', type=int, default=100_000)
+    parser.add_argument('--new-rate', type=float, default=0.1)
+    parser.add_argument('--floors', type=int, default=4)
+    args = parser.parse_args()
+
+    index = ComplaintClusterIndex()
+    complaints = synthetic_complaints(args.count, args.new_rate, args.floors)
+    window_start = time.perf_counter()
+    total_start = window_start
+    lookups = candidates = 0
+    for n, (issue_type, floor, text) in enumerate(complaints, start=1):
+        group = (issue_type, floor)
+        sig = signature(text)
+        if index.find(group, sig) is None:
+            index.add(n, group, sig)
+        if n % args.report_every == 0:
+            now = time.perf_counter()
+            per_insert = (now - window_start) / args.report_every * 1e6
+            per_lookup = (index.candidates_scored - candidates) / (index.lookups - lookups)
+            print(f"{n:>9} complaints  {len(index):>7} open clusters  "
+                  f"{per_insert:7.1f} us/insert  {per_lookup:6.2f} candidates/lookup")
+            lookups, candidates = index.lookups, index.candidates_scored
+            window_start = now
+    elapsed = time.perf_counter() - total_start
+    print(f"total {elapsed:.1f}s, {elapsed / args.count * 1e6:.1f} us/insert on average")
+
+
+if __name__ == '__main__':
+    main()
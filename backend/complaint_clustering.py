@@ -0,0 +1,187 @@
+import re
+import random
+import hashlib
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+# MinHash / LSH parameters. 25 bands of 5 rows puts the candidate
+# threshold at ~(1/25) ** (1/5) ~= 0.53, just under SIMILARITY_THRESHOLD,
+# so unrelated complaints rarely share a bucket.
+BANDS = 25
+ROWS = 5
+NUM_PERM = BANDS * ROWS
+SIMILARITY_THRESHOLD = 0.7
+
+# Each "permutation" XORs the 64-bit shingle hash with a random mask,
+# which is much cheaper in Python than (a * h + b) % p.
+_rng = random.Random(1729)
+_MASKS = [_rng.getrandbits(64) for _ in range(NUM_PERM)]
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+# Function words and filler that say nothing about which fault is reported.
+# Without them "Light not working in room" and "Fan not working in room"
+# share only "working".
+STOPWORDS = {
+    'a', 'an', 'the', 'in', 'on', 'at', 'of', 'to', 'for', 'from', 'with', 'and', 'or',
+    'is', 'are', 'was', 'were', 'be', 'been', 'it', 'its', 'this', 'that', 'my', 'our',
+    'i', 'we', 'me', 'us', 'there', 'not', 'no', 'very', 'too', 'again', 'still', 'since',
+    'room', 'floor', 'please', 'pls', 'plz', 'kindly', 'fix', 'asap', 'urgent', 'sir',
+    'madam', 'today', 'morning', 'evening', 'night', 'yesterday', 'now',
+}
+
+
+def normalize(text):
+    return _NON_WORD.sub(' ', (text or '').lower()).strip()
+
+
+def tokens(text):
+    """Content words of a description; numbers (room numbers etc.) are dropped."""
+    return [w for w in normalize(text).split() if w not in STOPWORDS and not w.isdigit()]
+
+
+def shingles(text):
+    """Word unigrams plus adjacent-word bigrams of the content words."""
+    words = tokens(text)
+    if not words:
+        return {normalize(text)}
+    return set(words) | {f'{a} {b}' for a, b in zip(words, words[1:])}
+
+
+def _hash_shingle(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big')
+
+
+def signature(text):
+    """MinHash signature of a complaint description (a tuple of NUM_PERM ints)."""
+    hashes = [_hash_shingle(s) for s in shingles(text)]
+    return tuple(min([h ^ mask for h in hashes]) for mask in _MASKS)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def encode_signature(sig):
+    return ','.join(str(v) for v in sig)
+
+
+def decode_signature(value):
+    return tuple(int(v) for v in value.split(','))
+
+
+def room_area(room_no):
+    """Area a room belongs to for clustering: its floor ('101' -> '1')."""
+    if not room_no:
+        return 'unassigned'
+    room_no = str(room_no).strip()
+    if room_no.isdigit() and len(room_no) > 2:
+        return room_no[:-2]
+    return room_no
+
+
+def _bands(sig):
+    return [hash(sig[i * ROWS:(i + 1) * ROWS]) for i in range(BANDS)]
+
+
+class ComplaintClusterIndex:
+    """In-memory LSH index over the signatures of open complaint clusters.
+
+    Clusters are bucketed per (group, band) so a lookup touches BANDS
+    buckets instead of scanning every open cluster. The database stays the
+    source of truth; the index is rebuilt from open clusters on startup.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.loaded = False
+        self.lookups = 0
+        self.candidates_scored = 0
+        self._buckets = {}
+        self._clusters = {}
+        self._group_locks = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._clusters)
+
+    def group_lock(self, group):
+        """Lock to hold from find() through add() so concurrent inserts of
+        the same complaint cannot each open their own cluster."""
+        with self._lock:
+            return self._group_locks.setdefault(group, threading.Lock())
+
+    def add(self, cluster_id, group, sig):
+        with self._lock:
+            bands = _bands(sig)
+            self._clusters[cluster_id] = (group, array('Q', sig), bands)
+            for band_no, band_hash in enumerate(bands):
+                self._buckets.setdefault((group, band_no, band_hash), set()).add(cluster_id)
+
+    def remove(self, cluster_id):
+        with self._lock:
+            entry = self._clusters.pop(cluster_id, None)
+            if not entry:
+                return
+            group, _, bands = entry
+            for band_no, band_hash in enumerate(bands):
+                key = (group, band_no, band_hash)
+                bucket = self._buckets.get(key)
+                if bucket:
+                    bucket.discard(cluster_id)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def find(self, group, sig):
+        """Return the id of the most similar open cluster in group, or None."""
+        with self._lock:
+            candidates = set()
+            for band_no, band_hash in enumerate(_bands(sig)):
+                candidates.update(self._buckets.get((group, band_no, band_hash), ()))
+            self.lookups += 1
+            self.candidates_scored += len(candidates)
+            best_id, best_score = None, self.threshold
+            for cluster_id in candidates:
+                score = similarity(sig, self._clusters[cluster_id][1])
+                if score >= best_score:
+                    best_id, best_score = cluster_id, score
+            return best_id
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._clusters.clear()
+            self.loaded = False
+
+
+def _signature_job(item):
+    key, group, description = item
+    return key, group, signature(description)
+
+
+def recluster(records, processes=None, chunksize=1000, threshold=SIMILARITY_THRESHOLD):
+    """Cluster (key, group, description) records from scratch.
+
+    Signatures are computed in a process pool; assignment then runs in
+    record order against a fresh index. Returns (assignments, clusters)
+    where assignments maps each record key to a cluster number and
+    clusters maps each cluster number to its (group, seed signature).
+    """
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        signed = pool.map(_signature_job, records, chunksize=chunksize)
+        index = ComplaintClusterIndex(threshold)
+        assignments = {}
+        clusters = {}
+        for key, group, sig in signed:
+            cluster_no = index.find(group, sig)
+            if cluster_no is None:
+                cluster_no = len(clusters) + 1
+                clusters[cluster_no] = (group, sig)
+                index.add(cluster_no, group, sig)
+            assignments[key] = cluster_no
+    return assignments, clusters
+
+
+# Create index instance
+complaint_index = ComplaintClusterIndex()
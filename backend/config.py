@@ -11,8 +11,8 @@ class Config:
     MYSQL_PASSWORD = os.getenv('DB_PASS', '')
     MYSQL_DATABASE = os.getenv('DB_NAME', 'hostel_management')
 
-    # Use mysql-connector-python driver
-    SQLALCHEMY_DATABASE_URI = (
+    # Use mysql-connector-python driver; DATABASE_URL overrides it (e.g. SQLite for tests)
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL') or (
         f"mysql+mysqlconnector://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
     )
     SQLALCHEMY_ENGINE_OPTIONS = {
@@ -20,5 +20,12 @@ class Config:
         'pool_recycle': 280,
     }
 
+    # Background jobs
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_CHUNK_SIZE = int(os.getenv('JOB_CHUNK_SIZE', '500'))
+    JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', '30'))
+    ROOM_RECONCILE_INTERVAL = int(os.getenv('ROOM_RECONCILE_INTERVAL', '3600'))
+    PAYMENT_SUMMARY_INTERVAL = int(os.getenv('PAYMENT_SUMMARY_INTERVAL', '86400'))
+
     # Flask configuration
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+import pytest
+
+_db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+
+
+@pytest.fixture
+def hostel(monkeypatch):
+    """The app module bound to a fresh SQLite database, with sample students."""
+    pytest.importorskip('flask_sqlalchemy')
+    import app as hostel
+    from complaint_clustering import complaint_index
+    from jobs import job_runner
+
+    monkeypatch.setattr(job_runner, 'schedules', [])
+    complaint_index.clear()
+    with hostel.app.app_context():
+        hostel.db.drop_all()
+        hostel.db.create_all()
+        hostel.db.session.add_all([
+            hostel.Room(room_no='101', type='Single', capacity=1),
+            hostel.Room(room_no='102', type='Double', capacity=2),
+            hostel.Room(room_no='103', type='Single', capacity=1),
+            hostel.Room(room_no='201', type='Suite', capacity=3),
+            hostel.Student(student_id='S1', name='Asha', age=20, gender='Female', contact='1', room_no='101'),
+            hostel.Student(student_id='S2', name='Ravi', age=21, gender='Male', contact='2', room_no='102'),
+            hostel.Student(student_id='S3', name='Meera', age=22, gender='Female', contact='3', room_no='201'),
+        ])
+        hostel.db.session.commit()
+    yield hostel
+    job_runner.shutdown()
+    complaint_index.clear()
+
+
+@pytest.fixture
+def client(hostel):
+    return hostel.app.test_client()
@@ -0,0 +1,207 @@
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+
+def encode_params(params):
+    return json.dumps(params or {}, sort_keys=True)
+
+
+class JobContext:
+    """Handed to a job handler: its params, last checkpointed state and progress."""
+
+    def __init__(self, runner, job):
+        self.runner = runner
+        self.job = job
+        self.params = json.loads(job.params or '{}')
+        self.state = json.loads(job.state or '{}')
+
+    def checkpoint(self, state, progress):
+        """Persist state and progress, committing the chunk's work with it.
+
+        A job interrupted by a restart is re-run from the last checkpoint.
+        """
+        self.state = state
+        self.job.state = json.dumps(state)
+        self.job.progress = round(min(max(progress, 0), 100), 2)
+        self.runner.db.session.commit()
+
+
+class JobRunner:
+    """In-process background job runner backed by a database job table.
+
+    Jobs are rows in the job table; a thread pool runs at most `workers` of
+    them at once and a scheduler thread enqueues periodic jobs. Only one
+    runner should be started per database: on start, jobs left 'Running'
+    by a previous process are put back in the queue to resume.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+        self.schedules = []
+        self.app = None
+        self.db = None
+        self.model = None
+        self.workers = 2
+        self.retention_days = 30
+        self._executor = None
+        self._scheduler = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._next_start_attempt = 0
+
+    def init_app(self, app, db, model, workers=2, retention_days=30):
+        self.app = app
+        self.db = db
+        self.model = model
+        self.workers = workers
+        self.retention_days = retention_days
+        # Whatever server is handling requests (app.run, flask run, a WSGI
+        # server) runs the jobs; the reloader's watcher process never does.
+        app.before_request(self.try_start)
+
+    def job(self, name):
+        def register(handler):
+            self.handlers[name] = handler
+            return handler
+        return register
+
+    def every(self, name, seconds, params=None):
+        """Enqueue job `name` every `seconds`; params may be a callable."""
+        self.schedules.append({'name': name, 'seconds': seconds, 'params': params, 'next_run': 0})
+
+    @property
+    def running(self):
+        return self._executor is not None
+
+    def enqueue(self, name, params=None):
+        if name not in self.handlers:
+            raise ValueError(f'Unknown job: {name}')
+        job = self.model(name=name, params=encode_params(params), state='{}', status='Queued')
+        self.db.session.add(job)
+        self.db.session.commit()
+        if self._executor:
+            self._executor.submit(self._run, job.job_id)
+        return job
+
+    def try_start(self, retry_after=30):
+        """Start the runner without letting a failure reach the caller.
+
+        Errors are logged and the start is retried at most every
+        `retry_after` seconds, so a broken job table never fails requests.
+        """
+        if self._executor or time.monotonic() < self._next_start_attempt:
+            return
+        try:
+            self.start()
+        except Exception as e:
+            self._next_start_attempt = time.monotonic() + retry_after
+            print(f"Job runner could not start: {e}")
+
+    def start(self):
+        if self._executor:
+            return
+        with self._start_lock:
+            if self._executor:
+                return
+            with self.app.app_context():
+                try:
+                    self.model.__table__.create(bind=self.db.engine, checkfirst=True)
+                    self.model.query.filter_by(status='Running').update({'status': 'Queued'})
+                    self.db.session.commit()
+                    queued = [j.job_id for j in self.model.query.filter_by(status='Queued').order_by(self.model.job_id)]
+                finally:
+                    self.db.session.remove()
+            executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job-worker')
+            for job_id in queued:
+                executor.submit(self._run, job_id)
+            self._executor = executor
+            self._stop.clear()
+            self._scheduler = threading.Thread(target=self._schedule_loop, name='job-scheduler', daemon=True)
+            self._scheduler.start()
+
+    def shutdown(self, wait=True):
+        self._stop.set()
+        if self._executor:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def prune(self):
+        """Delete finished jobs older than retention_days."""
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        deleted = self.model.query.filter(
+            self.model.status.in_(['Completed', 'Failed']),
+            self.model.finished_at < cutoff
+        ).delete(synchronize_session=False)
+        self.db.session.commit()
+        return deleted
+
+    def _schedule_loop(self):
+        next_prune = 0
+        while not self._stop.wait(1):
+            now = time.monotonic()
+            if now >= next_prune:
+                next_prune = now + 3600
+                with self.app.app_context():
+                    try:
+                        self.prune()
+                    except Exception as e:
+                        print(f"Pruning old jobs failed: {e}")
+                        self.db.session.rollback()
+                    finally:
+                        self.db.session.remove()
+            for entry in self.schedules:
+                if now < entry['next_run']:
+                    continue
+                entry['next_run'] = now + entry['seconds']
+                with self.app.app_context():
+                    try:
+                        params = entry['params']() if callable(entry['params']) else entry['params']
+                        pending = self.model.query.filter(
+                            self.model.name == entry['name'],
+                            self.model.params == encode_params(params),
+                            self.model.status.in_(['Queued', 'Running'])
+                        ).first()
+                        if not pending:
+                            self.enqueue(entry['name'], params)
+                    except Exception as e:
+                        print(f"Scheduling {entry['name']} failed: {e}")
+                        self.db.session.rollback()
+                    finally:
+                        self.db.session.remove()
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            try:
+                claimed = self.model.query.filter_by(job_id=job_id, status='Queued').update({
+                    'status': 'Running',
+                    'started_at': datetime.utcnow()
+                })
+                self.db.session.commit()
+                if not claimed:
+                    return
+                job = self.model.query.get(job_id)
+                try:
+                    result = self.handlers[job.name](JobContext(self, job))
+                except Exception as e:
+                    self.db.session.rollback()
+                    job = self.model.query.get(job_id)
+                    job.status = 'Failed'
+                    job.error = str(e)
+                else:
+                    job.status = 'Completed'
+                    job.progress = 100
+                    job.result = json.dumps(result)
+                job.finished_at = datetime.utcnow()
+                self.db.session.commit()
+            except Exception as e:
+                print(f"Job {job_id} could not be run: {e}")
+                self.db.session.rollback()
+            finally:
+                self.db.session.remove()
+
+
+# Create job runner instance
+job_runner = JobRunner()
@@ -0,0 +1,79 @@
+import random
+import pytest
+
+from complaint_clustering import ComplaintClusterIndex, room_area, signature, similarity, recluster
+
+GROUP = ('Electrical', '1')
+
+
+@pytest.mark.parametrize('first, second', [
+    ('Light not working in room', 'Fan not working in room'),
+    ('Tap leaking in bathroom', 'Shower leaking in bathroom'),
+    ('AC not working', 'Geyser not working'),
+    ('Power socket sparking', 'Light not working in room'),
+])
+def test_different_faults_are_not_clustered(first, second):
+    index = ComplaintClusterIndex()
+    index.add(1, GROUP, signature(first))
+    assert index.find(GROUP, signature(second)) is None
+
+
+@pytest.mark.parametrize('first, second', [
+    ('WiFi not working', 'wifi not working please fix'),
+    ('WiFi not working', 'WiFi not working in room 101'),
+    ('Leak in bathroom', 'leak in the bathroom!! urgent'),
+])
+def test_repeated_complaints_are_clustered(first, second):
+    index = ComplaintClusterIndex()
+    index.add(1, GROUP, signature(first))
+    assert index.find(GROUP, signature(second)) == 1
+
+
+def test_clusters_are_scoped_to_group():
+    index = ComplaintClusterIndex()
+    index.add(1, ('WiFi', '1'), signature('WiFi not working'))
+    assert index.find(('WiFi', '2'), signature('WiFi not working')) is None
+    assert index.find(('Electrical', '1'), signature('WiFi not working')) is None
+
+
+def test_removed_cluster_is_not_found():
+    index = ComplaintClusterIndex()
+    index.add(1, GROUP, signature('Fan is broken'))
+    index.remove(1)
+    assert index.find(GROUP, signature('Fan is broken')) is None
+    assert len(index) == 0
+
+
+def test_unrelated_complaints_are_rarely_candidates():
+    rng = random.Random(3)
+    vocab = [f'w{i}' for i in range(2000)]
+    index = ComplaintClusterIndex()
+    for n in range(2000):
+        index.add(n, GROUP, signature(' '.join(rng.sample(vocab, 4))))
+    for _ in range(200):
+        index.find(GROUP, signature(' '.join(rng.sample(vocab, 4))))
+    assert index.candidates_scored / index.lookups < 5
+
+
+def test_similarity_of_identical_text_is_one():
+    assert similarity(signature('No hot water'), signature('no hot water!')) == 1.0
+
+
+def test_room_area():
+    assert room_area('101') == '1'
+    assert room_area('1204') == '12'
+    assert room_area('A1') == 'A1'
+    assert room_area(None) == 'unassigned'
+
+
+def test_recluster_groups_duplicates():
+    records = [
+        (1, ('WiFi', '1'), 'WiFi not working'),
+        (2, ('WiFi', '1'), 'wifi NOT working'),
+        (3, ('WiFi', '2'), 'WiFi not working'),
+        (4, ('WiFi', '1'), 'router is down'),
+    ]
+    assignments, clusters = recluster(records, processes=1)
+    assert assignments[1] == assignments[2]
+    assert len({assignments[1], assignments[3], assignments[4]}) == 3
+    assert len(clusters) == 3
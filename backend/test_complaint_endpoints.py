@@ -0,0 +1,103 @@
+import pytest
+
+
+def post_complaint(client, student_id, issue_type, description):
+    response = client.post('/api/complaints', json={
+        'student_id': student_id, 'issue_type': issue_type, 'description': description
+    })
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def complaint_rows(hostel):
+    with hostel.app.app_context():
+        return {c.complaint_id: (c.cluster_id, c.status) for c in hostel.Complaint.query.all()}
+
+
+def test_duplicate_attaches_to_existing_cluster(client):
+    first = post_complaint(client, 'S1', 'WiFi', 'WiFi not working')
+    second = post_complaint(client, 'S2', 'WiFi', 'wifi not working please fix')
+    assert not first['duplicate']
+    assert second['duplicate']
+    assert second['cluster_id'] == first['cluster_id']
+
+
+def test_other_floor_or_issue_type_opens_new_cluster(client):
+    first = post_complaint(client, 'S1', 'WiFi', 'WiFi not working')
+    other_floor = post_complaint(client, 'S3', 'WiFi', 'WiFi not working')
+    other_type = post_complaint(client, 'S2', 'Electrical', 'WiFi not working')
+    assert len({first['cluster_id'], other_floor['cluster_id'], other_type['cluster_id']}) == 3
+    assert not other_floor['duplicate'] and not other_type['duplicate']
+
+
+def test_different_faults_are_not_resolved_together(client, hostel):
+    light = post_complaint(client, 'S1', 'Electrical', 'Light not working in room')
+    post_complaint(client, 'S2', 'Electrical', 'Fan not working in room')
+    assert client.post('/api/complaints/1/resolve', json={'cluster': True}).status_code == 200
+    assert complaint_rows(hostel) == {1: (light['cluster_id'], 'Resolved'), 2: (2, 'Pending')}
+
+
+def test_cluster_resolve_closes_every_pending_complaint(client, hostel):
+    from complaint_clustering import complaint_index
+
+    cluster_id = post_complaint(client, 'S1', 'WiFi', 'WiFi not working')['cluster_id']
+    post_complaint(client, 'S2', 'WiFi', 'WiFi not working!!')
+    post_complaint(client, 'S1', 'WiFi', 'wifi not working since morning')
+    response = client.post('/api/complaints/2/resolve', json={'cluster': True})
+    assert response.status_code == 200
+    assert {status for _, status in complaint_rows(hostel).values()} == {'Resolved'}
+    assert client.get('/api/complaints/clusters').get_json() == []
+    assert len(complaint_index) == 0
+
+    again = post_complaint(client, 'S1', 'WiFi', 'WiFi not working')
+    assert not again['duplicate']
+    assert again['cluster_id'] != cluster_id
+
+
+def test_resolving_last_pending_complaint_closes_cluster(client):
+    post_complaint(client, 'S1', 'Plumbing', 'Leak in bathroom')
+    post_complaint(client, 'S2', 'Plumbing', 'leak in the bathroom urgent')
+    client.post('/api/complaints/1/resolve')
+    assert client.get('/api/complaints/clusters').get_json()[0]['pending_complaints'] == 1
+    client.post('/api/complaints/2/resolve')
+    assert client.get('/api/complaints/clusters').get_json() == []
+
+
+def test_stale_index_entry_is_not_reused(client, hostel):
+    first = post_complaint(client, 'S1', 'WiFi', 'WiFi not working')
+    with hostel.app.app_context():
+        # As if another process had resolved the cluster.
+        hostel.ComplaintCluster.query.get(first['cluster_id']).status = 'Resolved'
+        hostel.db.session.commit()
+    second = post_complaint(client, 'S2', 'WiFi', 'WiFi not working')
+    assert not second['duplicate']
+    assert second['cluster_id'] != first['cluster_id']
+
+
+@pytest.mark.parametrize('body', [[1], 'cluster', 5])
+def test_resolve_rejects_non_object_body(client, body):
+    post_complaint(client, 'S1', 'WiFi', 'WiFi not working')
+    assert client.post('/api/complaints/1/resolve', json=body).status_code == 400
+
+
+def test_recluster_rewrites_cluster_ids(client, hostel):
+    with hostel.app.app_context():
+        hostel.db.session.add_all([
+            hostel.Complaint(student_id='S1', issue_type='WiFi', description='WiFi not working'),
+            hostel.Complaint(student_id='S2', issue_type='WiFi', description='wifi NOT working!!'),
+            hostel.Complaint(student_id='S3', issue_type='WiFi', description='WiFi not working'),
+            hostel.Complaint(student_id='S1', issue_type='WiFi', description='Router is down', status='Resolved'),
+        ])
+        hostel.db.session.commit()
+
+    result = hostel.app.test_cli_runner().invoke(args=['recluster-complaints', '--processes', '1'])
+    assert result.exit_code == 0, result.output
+
+    rows = complaint_rows(hostel)
+    assert all(cluster_id is not None for cluster_id, _ in rows.values())
+    assert rows[1][0] == rows[2][0]
+    assert len({rows[1][0], rows[3][0], rows[4][0]}) == 3
+    with hostel.app.app_context():
+        assert hostel.ComplaintCluster.query.get(rows[4][0]).status == 'Resolved'
+    open_clusters = client.get('/api/complaints/clusters').get_json()
+    assert sorted(c['pending_complaints'] for c in open_clusters) == [1, 2]
@@ -0,0 +1,226 @@
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from jobs import encode_params, job_runner
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def add_job(hostel, **fields):
+    fields.setdefault('params', '{}')
+    fields.setdefault('state', '{}')
+    with hostel.app.app_context():
+        job = hostel.Job(**fields)
+        hostel.db.session.add(job)
+        hostel.db.session.commit()
+        return job.job_id
+
+
+def get_job(hostel, job_id):
+    with hostel.app.app_context():
+        job = hostel.Job.query.get(job_id)
+        hostel.db.session.expunge(job)
+        return job
+
+
+def enqueue(hostel, name, params=None):
+    with hostel.app.app_context():
+        return job_runner.enqueue(name, params).job_id
+
+
+@pytest.fixture
+def counting_job(hostel, monkeypatch):
+    """A job that handles items 0-5 two at a time and can fail after a chunk."""
+    calls = {'runs': 0, 'handled': [], 'fail_after': None}
+
+    def handler(ctx):
+        calls['runs'] += 1
+        state = ctx.state or {'next': 0}
+        while state['next'] < 6:
+            chunk = list(range(state['next'], min(state['next'] + 2, 6)))
+            calls['handled'].extend(chunk)
+            state['next'] = chunk[-1] + 1
+            ctx.checkpoint(state, state['next'] * 100 / 6)
+            if calls['fail_after'] == state['next']:
+                calls['fail_after'] = None
+                raise RuntimeError('worker died')
+        return {'handled': state['next']}
+
+    monkeypatch.setitem(job_runner.handlers, 'counting', handler)
+    return calls
+
+
+def test_interrupted_job_resumes_from_checkpoint(hostel, counting_job):
+    counting_job['fail_after'] = 4
+    job_id = enqueue(hostel, 'counting')
+    job_runner._run(job_id)
+
+    job = get_job(hostel, job_id)
+    assert job.status == 'Failed'
+    assert json.loads(job.state) == {'next': 4}
+    assert job.progress == pytest.approx(66.67)
+
+    # As if the process had died mid-run: start() must requeue and resume it.
+    with hostel.app.app_context():
+        hostel.Job.query.get(job_id).status = 'Running'
+        hostel.db.session.commit()
+    job_runner.start()
+    assert wait_for(lambda: get_job(hostel, job_id).status == 'Completed')
+    assert counting_job['handled'] == [0, 1, 2, 3, 4, 5]
+    assert json.loads(get_job(hostel, job_id).result) == {'handled': 6}
+
+
+def test_start_requeues_running_jobs(hostel, counting_job):
+    job_id = add_job(hostel, name='counting', status='Running')
+    job_runner.start()
+    assert wait_for(lambda: get_job(hostel, job_id).status == 'Completed')
+    assert counting_job['runs'] == 1
+
+
+def test_queued_job_is_claimed_once(hostel, counting_job):
+    job_id = enqueue(hostel, 'counting')
+    barrier = threading.Barrier(4)
+
+    def run():
+        barrier.wait()
+        job_runner._run(job_id)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert counting_job['runs'] == 1
+    assert get_job(hostel, job_id).status == 'Completed'
+
+
+def test_scheduler_dedupes_by_name_and_params(hostel, counting_job, monkeypatch):
+    add_job(hostel, name='counting', status='Queued', params=encode_params({'month': '2024-12'}))
+    add_job(hostel, name='counting', status='Running', params=encode_params({'month': '2025-01'}))
+    monkeypatch.setattr(job_runner, 'schedules', [])
+    job_runner.every('counting', 3600, params={'month': '2025-01'})
+    job_runner.every('counting', 3600, params=lambda: {'month': '2025-02'})
+
+    job_runner._stop.clear()
+    thread = threading.Thread(target=job_runner._schedule_loop)
+    thread.start()
+    time.sleep(1.5)
+    job_runner._stop.set()
+    thread.join()
+
+    with hostel.app.app_context():
+        params = sorted(json.loads(j.params)['month'] for j in hostel.Job.query.all())
+    assert params == ['2024-12', '2025-01', '2025-02']
+
+
+def test_prune_honours_retention(hostel, monkeypatch):
+    monkeypatch.setattr(job_runner, 'retention_days', 30)
+    now = datetime.utcnow()
+    old_done = add_job(hostel, name='room_availability', status='Completed', finished_at=now - timedelta(days=40))
+    old_failed = add_job(hostel, name='room_availability', status='Failed', finished_at=now - timedelta(days=31))
+    recent = add_job(hostel, name='room_availability', status='Completed', finished_at=now - timedelta(days=10))
+    queued = add_job(hostel, name='room_availability', status='Queued')
+    with hostel.app.app_context():
+        assert job_runner.prune() == 2
+        remaining = {j.job_id for j in hostel.Job.query.all()}
+    assert remaining == {recent, queued}
+    assert old_done not in remaining and old_failed not in remaining
+
+
+def test_room_availability_job(hostel, monkeypatch):
+    monkeypatch.setattr(hostel.Config, 'JOB_CHUNK_SIZE', 3)
+    with hostel.app.app_context():
+        hostel.Room.query.get('103').availability = 'Occupied'
+        hostel.db.session.commit()
+    job_id = enqueue(hostel, 'room_availability')
+    job_runner._run(job_id)
+
+    assert json.loads(get_job(hostel, job_id).result) == {'rooms_checked': 4, 'rooms_updated': 4}
+    with hostel.app.app_context():
+        rooms = {r.room_no: r.availability for r in hostel.Room.query.all()}
+    assert rooms == {'101': 'Occupied', '102': 'Occupied', '103': 'Available', '201': 'Occupied'}
+
+
+def test_payment_summary_job(hostel, monkeypatch):
+    monkeypatch.setattr(hostel.Config, 'JOB_CHUNK_SIZE', 2)
+    with hostel.app.app_context():
+        hostel.db.session.add_all([
+            hostel.Payment(student_id='S1', amount=500, payment_date=date(2025, 1, 2), payment_type='Semester Fee'),
+            hostel.Payment(student_id='S1', amount=100, payment_date=date(2025, 1, 20), payment_type='Other'),
+            hostel.Payment(student_id='S9', amount=50, payment_date=date(2025, 1, 31), payment_type='Other',
+                           status='Pending'),
+            hostel.Payment(student_id='S2', amount=500, payment_date=date(2024, 12, 31), payment_type='Semester Fee'),
+        ])
+        hostel.db.session.commit()
+    job_id = enqueue(hostel, 'payment_summary', {'month': '2025-01'})
+    job_runner._run(job_id)
+
+    job = get_job(hostel, job_id)
+    assert json.loads(job.result) == {
+        'month': '2025-01',
+        'payment_count': 3,
+        'total_amount': 650.0,
+        'by_type': {'Semester Fee': 500.0, 'Other': 150.0},
+        'by_status': {'Completed': 2, 'Pending': 1},
+        'students_paid': 1,
+        'students_unpaid': ['S2', 'S3'],
+        'unknown_students': ['S9'],
+    }
+    assert 'by_student' not in json.loads(job.state)
+
+
+@pytest.mark.parametrize('body', [
+    {'name': 'nope'},
+    [1],
+    {'name': 'room_availability', 'params': []},
+    {'name': 'room_availability', 'params': None},
+    {'name': 'payment_summary', 'params': {'month': '2025-13'}},
+])
+def test_create_job_rejects_bad_requests(client, body):
+    assert client.post('/api/jobs', json=body).status_code == 400
+
+
+def test_job_endpoints(client, hostel):
+    response = client.post('/api/jobs', json={'name': 'room_availability'})
+    assert response.status_code == 202
+    job_id = response.get_json()['job']['job_id']
+    assert wait_for(lambda: client.get(f'/api/jobs/{job_id}').get_json()['status'] == 'Completed')
+    assert client.get(f'/api/jobs/{job_id}/result').get_json()['result']['rooms_checked'] == 4
+
+    failed = add_job(hostel, name='payment_summary', status='Failed', error='boom')
+    assert client.get(f'/api/jobs/{failed}/result').status_code == 409
+    assert client.get('/api/jobs/999').status_code == 404
+    assert client.get('/api/jobs/999/result').status_code == 404
+
+    assert [j['job_id'] for j in client.get('/api/jobs?status=Failed').get_json()] == [failed]
+    assert len(client.get('/api/jobs?limit=-1').get_json()) == 1
+
+
+def test_runner_failure_does_not_break_other_endpoints(client, hostel, monkeypatch):
+    with hostel.app.app_context():
+        hostel.Job.__table__.drop(hostel.db.engine)
+    assert client.get('/api/students').status_code == 200
+    assert job_runner.running
+    with hostel.app.app_context():
+        assert hostel.db.inspect(hostel.db.engine).has_table('jobs')
+
+    job_runner.shutdown()
+
+    def broken_start():
+        raise RuntimeError('database unavailable')
+
+    monkeypatch.setattr(job_runner, 'start', broken_start)
+    monkeypatch.setattr(job_runner, '_next_start_attempt', 0)
+    assert client.get('/api/students').status_code == 200
+    assert client.post('/api/jobs', json={'name': 'room_availability'}).status_code == 503
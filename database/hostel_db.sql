@@ -44,7 +44,41 @@ CREATE TABLE IF NOT EXISTS complaints (
     status ENUM('Pending', 'Resolved') DEFAULT 'Pending',
     complaint_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     resolved_date TIMESTAMP NULL,
-    FOREIGN KEY (student_id) REFERENCES students(student_id)
+    cluster_id INT NULL,
+    FOREIGN KEY (student_id) REFERENCES students(student_id),
+    INDEX idx_complaints_cluster (cluster_id)
+);
+
+-- Complaint clusters table (near-duplicate complaints grouped per issue type and floor)
+CREATE TABLE IF NOT EXISTS complaint_clusters (
+    cluster_id INT AUTO_INCREMENT PRIMARY KEY,
+    issue_type VARCHAR(30) NOT NULL,
+    area VARCHAR(10) NOT NULL,
+    signature TEXT NOT NULL,
+    status ENUM('Open', 'Resolved') DEFAULT 'Open',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Upgrading a database created before complaint clustering: the CREATE TABLE
+-- above leaves an existing complaints table unchanged, so add the column once:
+-- ALTER TABLE complaints ADD COLUMN cluster_id INT NULL;
+-- CREATE INDEX idx_complaints_cluster ON complaints (cluster_id);
+
+-- Background jobs table (queued/running/finished jobs with resumable state)
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(50) NOT NULL,
+    params TEXT,
+    state MEDIUMTEXT,
+    status ENUM('Queued', 'Running', 'Completed', 'Failed') DEFAULT 'Queued',
+    progress FLOAT DEFAULT 0,
+    result MEDIUMTEXT,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP NULL,
+    finished_at TIMESTAMP NULL,
+    INDEX idx_jobs_name (name),
+    INDEX idx_jobs_status (status)
 );
 
 -- Insert sample rooms